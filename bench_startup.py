@@ -0,0 +1,169 @@
+# bench_startup.py - Benchmark de cold start (python -X importtime)
+"""
+Mede o custo de importar os módulos do worker e falha se passar do orçamento.
+
+Uso:
+    python bench_startup.py              # bot, llm, logs, simulado
+    python bench_startup.py bot --runs 7
+    python bench_startup.py --on-ready   # sobe o bot de verdade (precisa de DISCORD_TOKEN)
+
+Importar o módulo não pode puxar dependências pesadas (Flask, Groq, requests, bs4)
+nem estourar o orçamento abaixo. Com --on-ready o bot é iniciado com LLM_STUB=1 e
+LOG_TRACE=1, e o tempo do processo até o registro "on_ready" é comparado com
+bot.ON_READY_BUDGET_S.
+
+O orçamento vale para o tempo próprio (self) dos módulos não-stdlib importados
+pelo módulo: nosso código + terceiros. Imports da stdlib (asyncio, json...) variam
+com o host e ficam de fora, mas aparecem no relatório.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import statistics
+from typing import Dict, List, Tuple
+
+# Orçamento de import (ms, mediana, só não-stdlib) por módulo, com folga larga.
+IMPORT_BUDGET_MS = {
+    "bot": 2000.0,
+    "llm": 50.0,
+    "logs": 50.0,
+    "simulado": 200.0,
+}
+
+# Pacotes que só podem ser importados sob demanda (primeiro uso / setup_hook).
+LAZY_PACKAGES = ("flask", "groq", "requests", "bs4")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def run_importtime(module: str) -> List[Tuple[int, int, str]]:
+    """Importa `module` em um processo novo; retorna [(self us, cumulativo us, pacote)] da sua árvore."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if proc.returncode != 0:
+        last = proc.stderr.strip().splitlines()[-1:] or ["erro desconhecido"]
+        raise RuntimeError(f"falha ao importar {module}: {last[0]}")
+
+    parsed: List[Tuple[int, int, int, str]] = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            parsed.append((int(m.group(1)), int(m.group(2)), len(m.group(3)), m.group(4)))
+
+    # importtime lista filhos antes do pai: a árvore do módulo são as linhas mais
+    # indentadas logo acima dele (o resto é a inicialização do interpretador/site).
+    for i in range(len(parsed) - 1, -1, -1):
+        if parsed[i][3] == module:
+            indent = parsed[i][2]
+            start = i
+            while start > 0 and parsed[start - 1][2] > indent:
+                start -= 1
+            return [(s, c, name) for s, c, _, name in parsed[start:i + 1]]
+    raise RuntimeError(f"{module} não aparece na saída do importtime")
+
+
+def _is_stdlib(name: str) -> bool:
+    top = name.split(".")[0]
+    return top in sys.stdlib_module_names or top in sys.builtin_module_names
+
+
+def bench(module: str, runs: int) -> Dict[str, object]:
+    own, total = [], []
+    entries: List[Tuple[int, int, str]] = []
+    for _ in range(runs):
+        entries = run_importtime(module)
+        own.append(sum(s for s, _, name in entries if not _is_stdlib(name)) / 1000.0)
+        total.append(entries[-1][1] / 1000.0)
+    eager = sorted({name.split(".")[0] for _, _, name in entries} & set(LAZY_PACKAGES))
+    top = sorted(((c, name) for _, c, name in entries), reverse=True)[:10]
+    return {"own_ms": statistics.median(own), "total_ms": statistics.median(total),
+            "eager": eager, "top": top}
+
+
+def bench_on_ready(timeout_factor: float = 3.0) -> bool:
+    """Sobe `python bot.py` e mede o tempo de parede até o trace de on_ready."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    try:
+        from bot import ON_READY_BUDGET_S
+    except ImportError as e:
+        print(f"⚠️ on_ready: não foi possível importar bot ({e})")
+        return False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = os.path.join(tmp, "bench.log")
+        env = dict(os.environ, LLM_STUB="1", LOG_TRACE="1", LOG_FILE=log_file)
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, "bot.py"], cwd=here, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        ready_ms = None
+        try:
+            while time.perf_counter() - start < ON_READY_BUDGET_S * timeout_factor:
+                if proc.poll() is not None:
+                    last = (proc.stderr.read().strip().splitlines() or ["sem saída"])[-1]
+                    print(f"⚠️ bot.py terminou antes do on_ready: {last}")
+                    return False
+                if os.path.exists(log_file):
+                    with open(log_file, encoding="utf-8") as f:
+                        for line in f:
+                            rec = json.loads(line)
+                            if rec.get("logger") == "bot.trace" and rec.get("msg") == "on_ready":
+                                ready_ms = rec.get("latency_ms")
+                    if ready_ms is not None:
+                        break
+                time.sleep(0.05)
+            wall = time.perf_counter() - start
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    if ready_ms is None:
+        print(f"❌ on_ready: não apareceu em {wall:.1f}s (orçamento: {ON_READY_BUDGET_S:.1f}s)")
+        return False
+    ok = wall <= ON_READY_BUDGET_S
+    print(f"{'✅' if ok else '❌'} on_ready: {wall:.2f}s de parede, {ready_ms / 1000:.2f}s desde BOOT_TIME "
+          f"(orçamento: {ON_READY_BUDGET_S:.1f}s)")
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=list(IMPORT_BUDGET_MS))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--on-ready", action="store_true", help="mede também o tempo até on_ready")
+    args = parser.parse_args(argv)
+
+    ok = not args.on_ready or bench_on_ready()
+    for module in args.modules:
+        budget = IMPORT_BUDGET_MS.get(module)
+        try:
+            res = bench(module, args.runs)
+        except RuntimeError as e:
+            print(f"⚠️ {e}")
+            ok = False
+            continue
+
+        status = "✅" if budget is None or res["own_ms"] <= budget else "❌"
+        print(f"{status} {module}: {res['own_ms']:.1f} ms não-stdlib (orçamento: {budget or '-'} ms), "
+              f"{res['total_ms']:.1f} ms no total")
+        for cumulative, name in res["top"]:
+            print(f"     {cumulative / 1000:8.1f} ms  {name}")
+        if res["eager"]:
+            print(f"   ❌ importados na carga (deveriam ser lazy): {', '.join(res['eager'])}")
+        if status == "❌" or res["eager"]:
+            ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,9 @@
 # bot.py - Versão Consolidada e Corrigida (revisada)
+# Marco zero do tempo até on_ready, tomado antes dos demais imports para que o
+# custo do discord.py entre na conta (orçamento em ON_READY_BUDGET_S; ver bench_startup.py).
+import time
+BOOT_TIME = time.perf_counter()
+
 import os
 import re
 import json
@@ -11,45 +16,32 @@ from typing import Dict, Any, List
 
 import discord
 from discord.ext import commands
-from groq import Groq
-from dotenv import load_dotenv
-from flask import Flask
+
+import llm
+import logs
 
 # =============================
 # Logging
 # =============================
-logging.basicConfig(
-    filename='bot_errors.log',
-    level=logging.ERROR,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+# Fila + listener em thread própria: nada de I/O de disco no event loop (ver logs.py).
+# Configurado em main(); antes disso os registros vão para o handler padrão do logging.
+logger = logging.getLogger("bot")
+log_error = logs.log_error
 
-def log_error(error: Exception, context: str = ""):
-    logging.error(f"{context} - {type(error).__name__}: {str(error)}", exc_info=True)
+ON_READY_BUDGET_S = 10.0
 
 # =============================
-# Variáveis de Ambiente
+# Flask Keep-Alive (iniciado no setup_hook; Flask é importado na própria thread)
 # =============================
-load_dotenv()
-DISCORD_TOKEN = os.getenv("DISCORD_TOKEN", "").strip()
-GROQ_API_KEY = os.getenv("GROQ_API_KEY", "").strip()
-
-if not DISCORD_TOKEN:
-    raise RuntimeError("Token do Discord ausente (verifique .env)")
-if not GROQ_API_KEY:
-    raise RuntimeError("Token Groq ausente (verifique .env)")
+def run_web():
+    from flask import Flask
 
-# =============================
-# Flask Keep-Alive (inicia depois de validar env)
-# =============================
-app = Flask(__name__)
+    app = Flask(__name__)
 
-@app.route('/')
-def home():
-    return "Bot LeDe_concursos rodando!"
+    @app.route('/')
+    def home():
+        return "Bot LeDe_concursos rodando!"
 
-def run_web():
     try:
         app.run(host='0.0.0.0', port=10000, use_reloader=False)
     except OSError as e:
@@ -58,8 +50,6 @@ def run_web():
         else:
             raise
 
-threading.Thread(target=run_web, daemon=True).start()
-
 # =============================
 # Constantes e Configurações
 # =============================
@@ -69,16 +59,21 @@ BANCAS_VALIDAS = {
     "AOCP", "FUNRIO", "OBJETIVA", "CPNU"
 }
 
-GROQ_MODEL = "llama3-70b-8192"
-groq_client = Groq(api_key=GROQ_API_KEY)
 groq_semaphore = asyncio.Semaphore(5)
+MENSAGEM_CURTA = 60  # menções até este tamanho vão para o modelo rápido
 
 # =============================
 # Discord Bot
 # =============================
+class LeDeBot(commands.Bot):
+    async def setup_hook(self):
+        threading.Thread(target=run_web, daemon=True).start()
+        # Cria o roteador e os clientes Groq fora do loop antes do primeiro comando.
+        self._warm_up_task = asyncio.create_task(asyncio.to_thread(llm.get_router().warm_up))
+
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(
+bot = LeDeBot(
     command_prefix="!",
     intents=intents,
     allowed_mentions=discord.AllowedMentions.none()
@@ -233,17 +228,15 @@ def extract_json(text: str) -> Any:
         blob = _find_first_json_blob(cand)
         return json.loads(blob)
 
-async def chat_groq(messages: List[Dict[str, str]], max_tokens: int = 700, temperature: float = 0.6) -> str:
+async def chat_groq(messages: List[Dict[str, str]], max_tokens: int = 700, temperature: float = 0.6,
+                    task: str = "chat") -> str:
+    """Encaminha para o roteador de LLM (modelo por tarefa, hedging e fallback em llm.py)."""
     async with groq_semaphore:
+        start = time.monotonic()
         try:
-            resp = await asyncio.to_thread(
-                groq_client.chat.completions.create,
-                model=GROQ_MODEL,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
-            return resp.choices[0].message.content
+            reply = await llm.get_router().complete(task, messages, max_tokens=max_tokens, temperature=temperature)
+            logs.trace("chat_groq", task=task, latency_ms=round((time.monotonic() - start) * 1000, 1))
+            return reply
         except Exception as e:
             log_error(e, "chat_groq")
             raise
@@ -274,7 +267,7 @@ async def gerar_simulado_json(banca: str, tema: str) -> Dict[str, Any]:
             {"role": "system", "content": build_simulado_system_prompt()},
             {"role": "user", "content": user_prompt}
         ]
-        raw = await chat_groq(messages, 1500, 0.4)
+        raw = await chat_groq(messages, 1500, 0.4, task="simulado")
         return extract_json(raw)
     except Exception as e:
         log_error(e, "gerar_simulado_json")
@@ -348,6 +341,8 @@ class AnswerButton(discord.ui.Button):
 
     async def callback(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
+        logs.bind(command="simulado_resposta", user=user_id,
+                  guild=str(interaction.guild_id) if interaction.guild_id else None)
         session = sim_sessions.get(user_id)
 
         if not session or session["current"] >= len(session["questions"]):
@@ -458,9 +453,21 @@ async def finalizar_simulado(interaction: discord.Interaction, user_id: str):
 # =============================
 # Eventos
 # =============================
+_first_ready = True
+
 @bot.event
 async def on_ready():
-    print(f"🤖 {bot.user.name} está online! Modo: Professor Concurseiro")
+    global _first_ready
+    if not _first_ready:
+        # on_ready dispara de novo a cada reconexão do gateway; o orçamento vale só para o boot.
+        print(f"🤖 {bot.user.name} reconectado.")
+        return
+    _first_ready = False
+    elapsed = time.perf_counter() - BOOT_TIME
+    print(f"🤖 {bot.user.name} está online! Modo: Professor Concurseiro ({elapsed:.1f}s)")
+    logs.trace("on_ready", latency_ms=round(elapsed * 1000, 1))
+    if elapsed > ON_READY_BUDGET_S:
+        logger.warning("on_ready em %.1fs (orçamento: %.1fs)", elapsed, ON_READY_BUDGET_S)
 
 @bot.event
 async def on_message(message: discord.Message):
@@ -470,6 +477,8 @@ async def on_message(message: discord.Message):
     # menções <@id> e <@!id>
     mentioned = any(u.id == bot.user.id for u in message.mentions)
     if mentioned:
+        logs.bind(command="mencao", user=str(message.author.id),
+                  guild=str(message.guild.id) if message.guild else None)
         cleaned = message.content
         cleaned = cleaned.replace(f"<@{bot.user.id}>", "")
         cleaned = cleaned.replace(f"<@!{bot.user.id}>", "")
@@ -481,7 +490,8 @@ async def on_message(message: discord.Message):
 
         try:
             msgs = [{"role": "system", "content": BASE_PROMPT}, *conversation_history]
-            reply = await chat_groq(msgs, 500, 0.6)
+            task = "saudacao" if len(user_input) <= MENSAGEM_CURTA else "chat"
+            reply = await chat_groq(msgs, 500, 0.6, task=task)
             if random.random() < 0.1:
                 reply += f"\n\n{random.choice(piadas_concursadas)}"
             await message.channel.send(reply)
@@ -491,6 +501,12 @@ async def on_message(message: discord.Message):
 
     await bot.process_commands(message)
 
+@bot.before_invoke
+async def bind_command_context(ctx: commands.Context):
+    logs.bind(command=ctx.command.qualified_name if ctx.command else None,
+              user=str(ctx.author.id), guild=str(ctx.guild.id) if ctx.guild else None)
+    logs.trace("command")
+
 # =============================
 # Comandos
 # =============================
@@ -611,10 +627,25 @@ async def on_command_error(ctx: commands.Context, error: commands.CommandError):
 # =============================
 # Inicialização
 # =============================
-if __name__ == "__main__":
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logs.setup_logging()
+
+    discord_token = os.getenv("DISCORD_TOKEN", "").strip()
+    if not discord_token:
+        raise RuntimeError("Token do Discord ausente (verifique .env)")
+    if not os.getenv("GROQ_API_KEY", "").strip() and not llm.using_stub():
+        raise RuntimeError("Token Groq ausente (verifique .env)")
+
     try:
-        bot.run(DISCORD_TOKEN)
+        # log_handler=None: logs do discord.py seguem só pela fila (sem StreamHandler síncrono).
+        bot.run(discord_token, log_handler=None)
     except Exception as e:
         log_error(e, "bot_startup")
         print(f"❌ Falha ao iniciar bot: {e}")
         raise
+
+if __name__ == "__main__":
+    main()
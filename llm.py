@@ -0,0 +1,347 @@
+# llm.py - Backend de LLM com múltiplos provedores, roteamento e fallback
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Callable, Tuple, Union
+
+logger = logging.getLogger("llm")
+
+Messages = List[Dict[str, str]]
+
+# =============================
+# Configuração
+# =============================
+# Modelo pequeno/rápido (saudações, menções curtas) e modelo grande (simulados).
+# Sobrescritos por LLM_MODEL_FAST / LLM_MODEL_LARGE, lidos ao montar o roteador (após load_dotenv).
+MODEL_FAST = "llama-3.1-8b-instant"
+MODEL_LARGE = "llama3-70b-8192"
+
+# Tarefas interativas recebem requisição "hedged" (segunda chamada em paralelo se a primeira demorar).
+INTERACTIVE_TASKS = frozenset({"saudacao", "chat"})
+
+# Timeout por tarefa (segundos) para cada tentativa em um provedor.
+TASK_TIMEOUTS = {"saudacao": 15.0, "chat": 30.0, "simulado": 90.0}
+
+# Atraso do hedge por tarefa enquanto não há amostras suficientes de latência;
+# depois vale o p95 observado (limitado a [HEDGE_DELAY_MIN, HEDGE_DELAY_MAX]).
+TASK_HEDGE_DELAYS = {"saudacao": 1.5, "chat": 8.0}
+HEDGE_DELAY_MIN = 0.5
+HEDGE_DELAY_MAX = 20.0
+LATENCY_WINDOW = 50         # últimas N latências por provedor
+MIN_SAMPLES = 5             # amostras mínimas para confiar no p95
+MAX_FAILURES = 3            # falhas seguidas antes de entrar em cooldown
+COOLDOWN_SECONDS = 60.0
+
+
+class LLMUnavailable(RuntimeError):
+    """Todos os provedores de uma tarefa falharam."""
+
+    def __init__(self, task: str, errors: Dict[str, Exception]):
+        self.task = task
+        self.errors = errors
+        detalhes = "; ".join(f"{nome}: {type(e).__name__}: {e}" for nome, e in errors.items())
+        super().__init__(f"Nenhum provedor disponível para '{task}' ({detalhes or 'sem provedores'})")
+
+
+# =============================
+# Provedores
+# =============================
+class LLMProvider:
+    """Interface mínima de um provedor: um nome único e `complete` assíncrono."""
+
+    name: str = "provider"
+
+    async def complete(self, messages: Messages, max_tokens: int, temperature: float) -> str:
+        raise NotImplementedError
+
+    def warm_up(self):
+        """Prepara recursos caros (imports, clientes) fora do caminho da primeira requisição."""
+
+
+class GroqProvider(LLMProvider):
+    """Provedor Groq para um modelo específico. O cliente é criado no primeiro uso."""
+
+    def __init__(self, model: str, api_key: Optional[str] = None):
+        self.model = model
+        self.name = f"groq:{model}"
+        self._api_key = api_key
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            from groq import AsyncGroq
+            # Cliente assíncrono: cancelar o hedge perdedor ou estourar o timeout aborta a requisição HTTP.
+            # Sem retries do SDK; repetição e fallback ficam por conta do roteador.
+            self._client = AsyncGroq(
+                api_key=self._api_key or os.getenv("GROQ_API_KEY", "").strip(),
+                timeout=max(TASK_TIMEOUTS.values()),
+                max_retries=0,
+            )
+        return self._client
+
+    def warm_up(self):
+        self._get_client()
+
+    async def complete(self, messages: Messages, max_tokens: int, temperature: float) -> str:
+        resp = await self._get_client().chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        usage = getattr(resp, "usage", None)
+        if usage is not None and logger.isEnabledFor(logging.INFO):
+            logger.info("llm_usage", extra={"provider": self.name, "tokens": getattr(usage, "total_tokens", None)})
+        return resp.choices[0].message.content
+
+
+class StubProvider(LLMProvider):
+    """Provedor local para testes: resposta fixa (ou função), atraso e erro configuráveis."""
+
+    def __init__(self, name: str = "stub",
+                 reply: Union[str, Callable[[Messages], str]] = "Resposta de teste.",
+                 delay: float = 0.0, error: Optional[Exception] = None):
+        self.name = name
+        self.reply = reply
+        self.delay = delay
+        self.error = error
+        self.calls: List[Messages] = []
+
+    async def complete(self, messages: Messages, max_tokens: int, temperature: float) -> str:
+        self.calls.append(messages)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.reply(messages) if callable(self.reply) else self.reply
+
+
+# =============================
+# Estatísticas por provedor
+# =============================
+class _ProviderStats:
+    def __init__(self, window: int):
+        self.latencies: deque = deque(maxlen=window)
+        self.failures = 0
+        self.cooldown_until = 0.0
+
+    def record_success(self, elapsed: float):
+        self.latencies.append(elapsed)
+        self.failures = 0
+        self.cooldown_until = 0.0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= MAX_FAILURES:
+            self.cooldown_until = time.monotonic() + COOLDOWN_SECONDS
+            # Ao sair do cooldown o provedor recomeça a contagem, em vez de voltar já no limite.
+            self.failures = 0
+
+    def record_censored(self, elapsed: float):
+        """
+        Chamada cancelada após perder o hedge: `elapsed` é só um limite inferior da latência.
+        Entra no p95 (lentidão aparece no atraso do hedge), mas não conta como falha.
+        """
+        self.latencies.append(elapsed)
+
+    def cooling(self) -> bool:
+        return time.monotonic() < self.cooldown_until
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        idx = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+        return ordered[idx]
+
+
+# =============================
+# Roteador
+# =============================
+class LLMRouter:
+    """
+    Escolhe provedores por tipo de tarefa.
+    - Cada rota é uma lista de níveis de preferência; um nível pode ser um provedor ou uma
+      lista de provedores equivalentes. O p95 observado só reordena dentro do mesmo nível.
+    - Estatísticas são por (tarefa, provedor): latências de saudações não contam para simulados.
+    - Provedores com erros/timeouts seguidos ficam em cooldown e vão para o fim.
+    - Tarefas interativas disparam uma segunda chamada equivalente (outro provedor do mesmo
+      nível ou o mesmo modelo de novo) se a primeira passar do p95; nunca troca de modelo.
+    - Erros/timeouts caem automaticamente para o próximo provedor.
+    """
+
+    def __init__(self, routes: Dict[str, Sequence[Union[LLMProvider, Sequence[LLMProvider]]]],
+                 interactive: frozenset = INTERACTIVE_TASKS,
+                 timeouts: Optional[Dict[str, float]] = None,
+                 hedge_delays: Optional[Dict[str, float]] = None):
+        self.routes: Dict[str, List[List[LLMProvider]]] = {
+            task: [list(tier) if isinstance(tier, (list, tuple)) else [tier] for tier in tiers]
+            for task, tiers in routes.items()
+        }
+        self.interactive = interactive
+        self.timeouts = dict(TASK_TIMEOUTS if timeouts is None else timeouts)
+        self.hedge_delays = dict(TASK_HEDGE_DELAYS if hedge_delays is None else hedge_delays)
+        self._stats: Dict[Tuple[str, str], _ProviderStats] = {}
+
+    def stats(self, task: str, provider: LLMProvider) -> _ProviderStats:
+        key = (task, provider.name)
+        st = self._stats.get(key)
+        if st is None:
+            st = self._stats[key] = _ProviderStats(LATENCY_WINDOW)
+        return st
+
+    def ordered(self, task: str) -> List[LLMProvider]:
+        tiers = self.routes.get(task) or self.routes.get("chat") or []
+        ativos: List[LLMProvider] = []
+        em_cooldown: List[LLMProvider] = []
+        for tier in tiers:
+            vivos = [p for p in tier if not self.stats(task, p).cooling()]
+            em_cooldown += [p for p in tier if p not in vivos]
+            p95s = [self.stats(task, p).p95() for p in vivos]
+            if len(vivos) > 1 and all(v is not None for v in p95s):
+                vivos = [p for _, p in sorted(zip(p95s, vivos), key=lambda t: t[0])]
+            ativos += vivos
+        return ativos + em_cooldown
+
+    def warm_up(self):
+        vistos = set()
+        for tiers in self.routes.values():
+            for p in (p for tier in tiers for p in tier):
+                if p.name in vistos:
+                    continue
+                vistos.add(p.name)
+                try:
+                    p.warm_up()
+                except Exception as e:
+                    logger.warning("warm_up: %s falhou (%s: %s)", p.name, type(e).__name__, e)
+
+    def _hedge_delay_for(self, task: str, provider: LLMProvider) -> float:
+        p95 = self.stats(task, provider).p95()
+        delay = self.hedge_delays.get(task, HEDGE_DELAY_MAX) if p95 is None else p95
+        return max(HEDGE_DELAY_MIN, min(HEDGE_DELAY_MAX, delay))
+
+    def _hedge_target(self, task: str, primary: LLMProvider) -> LLMProvider:
+        """Outro provedor ativo do mesmo nível do primário; sem ele, o próprio primário (mesmo modelo)."""
+        for tier in self.routes.get(task) or self.routes.get("chat") or []:
+            if primary in tier:
+                for p in tier:
+                    if p is not primary and not self.stats(task, p).cooling():
+                        return p
+        return primary
+
+    async def _call(self, provider: LLMProvider, task: str, messages: Messages,
+                    max_tokens: int, temperature: float) -> str:
+        start = time.monotonic()
+        try:
+            coro = provider.complete(messages, max_tokens, temperature)
+            timeout = self.timeouts.get(task)
+            out = await (asyncio.wait_for(coro, timeout) if timeout else coro)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.stats(task, provider).record_failure()
+            raise
+        elapsed = time.monotonic() - start
+        self.stats(task, provider).record_success(elapsed)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("llm_call", extra={"provider": provider.name, "task": task,
+                                           "latency_ms": round(elapsed * 1000, 1)})
+        return out
+
+    async def _hedged(self, primary: LLMProvider, hedge: LLMProvider, task: str,
+                      messages: Messages, max_tokens: int, temperature: float,
+                      errors: Dict[str, Exception]) -> Optional[str]:
+        start = time.monotonic()
+        first = asyncio.create_task(self._call(primary, task, messages, max_tokens, temperature))
+        second: Optional[asyncio.Task] = None
+        pending = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self._hedge_delay_for(task, primary))
+            if first in done and first.exception() is not None:
+                # Erro antes do hedge: segue direto para o fallback.
+                errors[primary.name] = first.exception()
+                return None
+            while True:
+                for t in done:
+                    pending.discard(t)
+                    if t.exception() is None:
+                        if t is second and first in pending:
+                            self.stats(task, primary).record_censored(time.monotonic() - start)
+                            logger.info("hedge: %s venceu a chamada original (%s)", hedge.name, task)
+                        return t.result()
+                    errors[(primary if t is first else hedge).name] = t.exception()
+                if second is None:
+                    second = asyncio.create_task(self._call(hedge, task, messages, max_tokens, temperature))
+                    pending.add(second)
+                if not pending:
+                    return None
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for t in pending:
+                t.cancel()
+
+    async def complete(self, task: str, messages: Messages,
+                       max_tokens: int = 700, temperature: float = 0.6) -> str:
+        providers = self.ordered(task)
+        errors: Dict[str, Exception] = {}
+
+        if task in self.interactive and providers:
+            primary = providers[0]
+            hedge = self._hedge_target(task, primary)
+            out = await self._hedged(primary, hedge, task, messages, max_tokens, temperature, errors)
+            if out is not None:
+                return out
+            providers = [p for p in providers[1:] if p is not hedge]
+
+        for provider in providers:
+            try:
+                return await self._call(provider, task, messages, max_tokens, temperature)
+            except Exception as e:
+                errors[provider.name] = e
+                logger.warning("fallback: %s falhou em '%s' (%s: %s)", provider.name, task, type(e).__name__, e)
+
+        raise LLMUnavailable(task, errors)
+
+
+# =============================
+# Roteador padrão
+# =============================
+def using_stub() -> bool:
+    return os.getenv("LLM_STUB", "").strip().lower() in {"1", "true", "yes", "sim"}
+
+
+def build_default_router() -> LLMRouter:
+    if using_stub():
+        fast = StubProvider("stub:fast", reply="Oi! Qual banca/tema você quer focar hoje?")
+        large = StubProvider("stub:large", reply='{"banca":"FGV","formato":"multipla_escolha","tema":"geral","questoes":[]}')
+    else:
+        fast = GroqProvider(os.getenv("LLM_MODEL_FAST", MODEL_FAST).strip())
+        large = GroqProvider(os.getenv("LLM_MODEL_LARGE", MODEL_LARGE).strip())
+    return LLMRouter(default_routes(fast, large))
+
+
+def default_routes(fast: LLMProvider, large: LLMProvider) -> Dict[str, List[LLMProvider]]:
+    """Rotas de produção: modelo rápido para saudações, grande para chat e simulados."""
+    return {
+        "saudacao": [fast, large],
+        "chat": [large, fast],
+        "simulado": [large, fast],
+    }
+
+
+_router: Optional[LLMRouter] = None
+
+
+def get_router() -> LLMRouter:
+    global _router
+    if _router is None:
+        _router = build_default_router()
+    return _router
+
+
+def set_router(router: Optional[LLMRouter]):
+    """Substitui o roteador global (ex.: testes com StubProvider)."""
+    global _router
+    _router = router
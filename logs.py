@@ -0,0 +1,240 @@
+# logs.py - Logging estruturado (JSON) e não bloqueante via QueueHandler/QueueListener
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+# =============================
+# Configuração
+# =============================
+# Padrões; as variáveis LOG_* do ambiente são lidas em setup_logging() (após load_dotenv).
+LOG_FILE = "bot_errors.log"
+LOG_LEVEL = "WARNING"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 5
+LOG_QUEUE_SIZE = 10000
+SHUTDOWN_TIMEOUT = 5.0  # segundos esperando espaço na fila ao desligar
+SAMPLE_WINDOW = 60.0  # segundos entre registros de um mesmo erro
+
+# Rastreamento de requisições (INFO) fica desligado até LOG_TRACE=1.
+trace_logger = logging.getLogger("bot.trace")
+
+# Campos extras copiados para o JSON quando presentes no registro.
+EXTRA_FIELDS = (
+    "command", "user", "guild", "context", "task", "provider",
+    "latency_ms", "tokens", "suppressed", "dropped",
+)
+
+# Contexto da requisição atual (comando/usuário/servidor), propagado por task e to_thread.
+_request_ctx: ContextVar[Dict[str, Any]] = ContextVar("request_ctx", default={})
+
+
+def bind(**fields):
+    """Adiciona campos ao contexto da requisição atual; retorna o token do ContextVar."""
+    return _request_ctx.set({**_request_ctx.get(), **fields})
+
+
+def log_error(error: Exception, context: str = ""):
+    """Erro com traceback; a formatação acontece na thread do listener, não no loop."""
+    logging.getLogger("bot").error("%s - %s: %s", context, type(error).__name__, error,
+                                   exc_info=error, extra={"context": context})
+
+
+def trace(event: str, **fields):
+    """Registro INFO de rastreamento; custo desprezível quando desligado."""
+    if trace_logger.isEnabledFor(logging.INFO):
+        trace_logger.info(event, extra=fields)
+
+
+# =============================
+# Formatação JSON (roda na thread do listener)
+# =============================
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "ts": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.created)),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in EXTRA_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                data[key] = value
+        if record.exc_info:
+            data["error_type"] = record.exc_info[0].__name__ if record.exc_info[0] else None
+            data["traceback"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+# =============================
+# Amostragem de erros repetidos (roda no loop, apenas operações de dict)
+# =============================
+class RepeatedErrorSampler(logging.Filter):
+    """
+    Deixa passar a primeira ocorrência de um erro idêntico por janela; as demais são
+    contadas. Quando a janela expira (ou no desligamento), `sweep` devolve um registro
+    resumo com o total suprimido, para que o fim de uma rajada não perca a contagem.
+    """
+
+    def __init__(self, window: float = SAMPLE_WINDOW, max_keys: int = 1000):
+        super().__init__()
+        self.window = window
+        self.max_keys = max_keys
+        self._seen: Dict[Tuple, list] = {}
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+        exc_type = record.exc_info[0].__name__ if record.exc_info and record.exc_info[0] else None
+        key = (record.name, record.levelno, getattr(record, "context", None), exc_type, record.getMessage())
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                return False
+            if entry is not None and entry[1]:
+                record.suppressed = entry[1]
+            self._seen[key] = [now, 0]
+        return True
+
+    def sweep(self, force: bool = False) -> List[logging.LogRecord]:
+        """Remove janelas expiradas e devolve resumos das que tiveram supressões."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_sweep < self.window and len(self._seen) < self.max_keys:
+                return []
+            self._last_sweep = now
+            overflow = len(self._seen) >= self.max_keys
+            expired = [k for k, (ts, _) in self._seen.items() if force or overflow or now - ts >= self.window]
+            resumos = []
+            for key in expired:
+                _, count = self._seen.pop(key)
+                if count:
+                    resumos.append(self._summary(key, count))
+        return resumos
+
+    @staticmethod
+    def _summary(key: Tuple, count: int) -> logging.LogRecord:
+        name, levelno, context, _, message = key
+        return logging.makeLogRecord({
+            "name": name, "levelno": levelno, "levelname": logging.getLevelName(levelno),
+            "msg": message, "context": context, "suppressed": count,
+        })
+
+
+# =============================
+# QueueHandler sem formatação na thread do loop
+# =============================
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, q: queue.Queue, sampler: Optional[RepeatedErrorSampler] = None):
+        super().__init__(q)
+        self.dropped = 0
+        self.sampler = sampler
+        if sampler is not None:
+            self.addFilter(sampler)
+
+    def handle(self, record: logging.LogRecord):
+        self.flush_suppressed()
+        if self.dropped and not self.queue.full():
+            self._report_dropped()
+        return super().handle(record)
+
+    def flush_suppressed(self, force: bool = False, block: bool = False):
+        if self.sampler is None:
+            return
+        for resumo in self.sampler.sweep(force):
+            self.enqueue(resumo, block)
+
+    def _report_dropped(self, block: bool = False):
+        dropped, self.dropped = self.dropped, 0
+        self.enqueue(logging.makeLogRecord({
+            "name": "logs", "levelno": logging.WARNING, "levelname": "WARNING",
+            "msg": "registros descartados com a fila de log cheia", "dropped": dropped,
+        }), block)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Só anexa o contexto da requisição; traceback e JSON ficam para o listener.
+        for key, value in _request_ctx.get().items():
+            if getattr(record, key, None) is None:
+                setattr(record, key, value)
+        return record
+
+    def enqueue(self, record: logging.LogRecord, block: bool = False):
+        try:
+            if block:
+                self.queue.put(record, timeout=SHUTDOWN_TIMEOUT)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # A fila é limitada: no desligamento espera o listener abrir espaço em vez de
+        # levantar queue.Full e deixar a thread (e os registros pendentes) para trás.
+        self.queue.put(self._sentinel, timeout=SHUTDOWN_TIMEOUT)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[_NonBlockingQueueHandler] = None
+
+
+def setup_logging() -> Optional[logging.handlers.QueueListener]:
+    """Configura o root logger com fila + listener (arquivo rotativo em JSON). Idempotente."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        os.getenv("LOG_FILE", LOG_FILE),
+        maxBytes=int(os.getenv("LOG_MAX_BYTES", LOG_MAX_BYTES)),
+        backupCount=int(os.getenv("LOG_BACKUPS", LOG_BACKUPS)),
+        encoding="utf-8", delay=True
+    )
+    file_handler.setFormatter(JsonFormatter())
+
+    q: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = _NonBlockingQueueHandler(q, RepeatedErrorSampler(float(os.getenv("LOG_SAMPLE_WINDOW", SAMPLE_WINDOW))))
+    _queue_handler = queue_handler
+
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(queue_handler)
+    level = os.getenv("LOG_LEVEL", LOG_LEVEL).strip().upper()
+    root.setLevel(getattr(logging, level, logging.WARNING))
+    if os.getenv("LOG_TRACE", "").strip().lower() in {"1", "true", "yes", "sim"}:
+        trace_logger.setLevel(logging.INFO)
+        logging.getLogger("llm").setLevel(logging.INFO)
+
+    _listener = _Listener(q, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Registra supressões e descartes pendentes, esvazia a fila e para o listener."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        _queue_handler.flush_suppressed(force=True, block=True)
+        if _queue_handler.dropped:
+            _queue_handler._report_dropped(block=True)
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for h in _listener.handlers:
+            h.close()
+        _listener = None
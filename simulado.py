@@ -1,15 +1,11 @@
 # simulado.py
-import requests
-from bs4 import BeautifulSoup
-from groq import Groq
 import random
-import os
+import asyncio
 from dotenv import load_dotenv
 
-load_dotenv()
+import llm
 
-# 🔑 Configuração Groq
-groq = Groq(api_key=os.getenv("GROQ_API_KEY"))
+load_dotenv()
 
 
 # ------------------------------
@@ -20,6 +16,10 @@ def buscar_questoes_qconcursos(qtd=5):
     Busca questões do Qconcursos (exemplo simples).
     Retorna lista de tuplas: (enunciado, alternativas).
     """
+    # requests/bs4 só são importados quando o scraping é usado de fato.
+    import requests
+    from bs4 import BeautifulSoup
+
     url = "https://www.qconcursos.com/questoes-de-concursos/disciplinas/direito-direito-constitucional"
     r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
     soup = BeautifulSoup(r.text, "html.parser")
@@ -61,13 +61,11 @@ def analisar_com_ia(enunciado, alternativas):
     2. Justifique a resposta de forma objetiva, como faria uma banca de concurso.
     """
 
-    resposta = groq.chat.completions.create(
-        model="llama3-70b-8192",
-        messages=[{"role": "user", "content": prompt}],
+    return asyncio.run(llm.get_router().complete(
+        "simulado",
+        [{"role": "user", "content": prompt}],
         max_tokens=400,
-    )
-
-    return resposta.choices[0].message["content"]
+    ))
 
 
 # ------------------------------
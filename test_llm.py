@@ -0,0 +1,157 @@
+# test_llm.py - Roteador de LLM com StubProvider (sem rede)
+import asyncio
+
+import pytest
+
+import llm
+from llm import LLMRouter, LLMUnavailable, StubProvider
+
+MSGS = [{"role": "user", "content": "oi"}]
+
+
+class SequenciaStub(StubProvider):
+    """Stub com um atraso diferente a cada chamada (para exercitar o hedge no mesmo modelo)."""
+
+    def __init__(self, name, delays):
+        super().__init__(name, reply=name)
+        self.delays = list(delays)
+
+    async def complete(self, messages, max_tokens, temperature):
+        self.delay = self.delays.pop(0) if self.delays else 0.0
+        return await super().complete(messages, max_tokens, temperature)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture(autouse=True)
+def hedge_rapido(monkeypatch):
+    monkeypatch.setattr(llm, "HEDGE_DELAY_MIN", 0.01)
+
+
+def test_fallback_em_erro():
+    ruim = StubProvider("ruim", error=RuntimeError("503"))
+    bom = StubProvider("bom", reply="ok")
+    router = LLMRouter({"simulado": [ruim, bom]})
+
+    assert run(router.complete("simulado", MSGS)) == "ok"
+    assert len(ruim.calls) == 1 and len(bom.calls) == 1
+
+
+def test_todos_falham_levanta_llm_unavailable():
+    router = LLMRouter({"simulado": [StubProvider("a", error=ValueError("x")),
+                                     StubProvider("b", error=ValueError("y"))]})
+
+    with pytest.raises(LLMUnavailable) as exc:
+        run(router.complete("simulado", MSGS))
+    assert set(exc.value.errors) == {"a", "b"}
+
+
+def test_hedge_vai_para_outro_provedor_do_mesmo_nivel():
+    lento = StubProvider("lento", reply="lento", delay=0.5)
+    rapido = StubProvider("rapido", reply="rapido")
+    router = LLMRouter({"chat": [(lento, rapido)]}, hedge_delays={"chat": 0.02})
+
+    assert run(router.complete("chat", MSGS)) == "rapido"
+    stats = router.stats("chat", lento)
+    assert len(stats.latencies) == 1  # latência censurada registrada
+    assert stats.failures == 0        # hedge perdido não é falha
+
+
+def test_hedge_repete_o_mesmo_modelo_sem_trocar_de_nivel():
+    grande = SequenciaStub("grande", delays=[0.5, 0.0])
+    pequeno = StubProvider("pequeno", reply="pequeno")
+    router = LLMRouter({"chat": [grande, pequeno]}, hedge_delays={"chat": 0.02})
+
+    assert run(router.complete("chat", MSGS)) == "grande"
+    assert len(grande.calls) == 2
+    assert pequeno.calls == []
+
+
+def test_hedge_nao_dispara_se_primario_responde():
+    primario = StubProvider("primario", reply="p")
+    secundario = StubProvider("secundario", reply="s")
+    router = LLMRouter({"chat": [(primario, secundario)]}, hedge_delays={"chat": 0.5})
+
+    assert run(router.complete("chat", MSGS)) == "p"
+    assert secundario.calls == []
+
+
+def test_erro_antes_do_hedge_vai_para_fallback():
+    ruim = StubProvider("ruim", error=RuntimeError("503"))
+    bom = StubProvider("bom", reply="ok")
+    router = LLMRouter({"chat": [ruim, bom]})
+
+    assert run(router.complete("chat", MSGS)) == "ok"
+    assert len(ruim.calls) == 1
+
+
+def test_cooldown_apos_max_failures():
+    ruim = StubProvider("ruim", error=RuntimeError("503"))
+    bom = StubProvider("bom", reply="ok")
+    router = LLMRouter({"simulado": [ruim, bom]})
+
+    for _ in range(llm.MAX_FAILURES):
+        run(router.complete("simulado", MSGS))
+    assert [p.name for p in router.ordered("simulado")] == ["bom", "ruim"]
+
+    run(router.complete("simulado", MSGS))
+    assert len(ruim.calls) == llm.MAX_FAILURES  # em cooldown, não é mais chamado
+
+
+def test_cooldown_recomeca_contagem_ao_expirar():
+    ruim = StubProvider("ruim", error=RuntimeError("503"))
+    router = LLMRouter({"simulado": [ruim, StubProvider("bom")]})
+
+    for _ in range(llm.MAX_FAILURES):
+        run(router.complete("simulado", MSGS))
+    stats = router.stats("simulado", ruim)
+    assert stats.cooling()
+
+    stats.cooldown_until = 0.0  # cooldown expirou
+    run(router.complete("simulado", MSGS))
+    assert not stats.cooling()
+
+
+def test_rotas_padrao_chat_fica_no_modelo_grande_lento_mas_saudavel():
+    rapido = StubProvider("rapido", reply="rapido")
+    grande = StubProvider("grande", reply="grande", delay=0.03)
+    router = LLMRouter(llm.default_routes(rapido, grande),
+                       hedge_delays={"saudacao": 0.01, "chat": 0.01})
+
+    for _ in range(10):
+        assert run(router.complete("chat", MSGS)) == "grande"
+    assert router.ordered("chat")[0] is grande
+    assert router.stats("chat", grande).failures == 0
+    assert rapido.calls == []
+    assert run(router.complete("saudacao", MSGS)) == "rapido"
+
+
+def test_preferencia_por_tarefa_nao_muda_com_latencia_de_outra_tarefa():
+    rapido = StubProvider("rapido", reply="rapido")
+    grande = StubProvider("grande", reply="grande", delay=0.005)
+    router = LLMRouter({
+        "saudacao": [rapido, grande],
+        "chat": [grande, rapido],
+        "simulado": [grande, rapido],
+    }, hedge_delays={"chat": 0.5})
+
+    for _ in range(llm.MIN_SAMPLES + 1):
+        run(router.complete("saudacao", MSGS))
+        run(router.complete("simulado", MSGS))
+
+    assert router.ordered("simulado")[0] is grande
+    assert run(router.complete("simulado", MSGS)) == "grande"
+    assert run(router.complete("chat", MSGS)) == "grande"
+
+
+def test_p95_reordena_dentro_do_mesmo_nivel():
+    a = StubProvider("a", reply="a", delay=0.02)
+    b = StubProvider("b", reply="b")
+    router = LLMRouter({"simulado": [(a, b)]})
+
+    for _ in range(llm.MIN_SAMPLES):
+        run(router._call(a, "simulado", MSGS, 10, 0.0))
+        run(router._call(b, "simulado", MSGS, 10, 0.0))
+    assert [p.name for p in router.ordered("simulado")] == ["b", "a"]
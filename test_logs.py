@@ -0,0 +1,97 @@
+# test_logs.py - Pipeline de logging (fila, JSON, amostragem)
+import sys
+import json
+import queue
+import logging
+import contextvars
+
+import logs
+from logs import RepeatedErrorSampler, _NonBlockingQueueHandler
+
+
+def erro(msg: str = "chat_groq - APIError: 503") -> logging.LogRecord:
+    return logging.makeLogRecord({"name": "bot", "levelno": logging.ERROR,
+                                  "levelname": "ERROR", "msg": msg, "context": "chat_groq"})
+
+
+def test_suprime_repetidos_dentro_da_janela():
+    sampler = RepeatedErrorSampler(window=60)
+
+    assert sampler.filter(erro())
+    assert not any(sampler.filter(erro()) for _ in range(10))
+    assert sampler.filter(erro("outro erro"))
+
+
+def test_sweep_emite_contagem_quando_a_janela_expira():
+    sampler = RepeatedErrorSampler(window=60)
+    for _ in range(500):
+        sampler.filter(erro())
+
+    sampler.window = 0.0
+    resumos = sampler.sweep()
+    assert len(resumos) == 1
+    assert resumos[0].suppressed == 499
+    assert resumos[0].getMessage() == "chat_groq - APIError: 503"
+    assert sampler.sweep(force=True) == []
+
+
+def test_sweep_forcado_no_desligamento():
+    sampler = RepeatedErrorSampler(window=60)
+    for _ in range(3):
+        sampler.filter(erro())
+
+    assert sampler.sweep() == []
+    assert [r.suppressed for r in sampler.sweep(force=True)] == [2]
+
+
+def test_pipeline_grava_json_com_contexto_e_traceback(tmp_path, monkeypatch):
+    arquivo = tmp_path / "bot.log"
+    monkeypatch.setenv("LOG_FILE", str(arquivo))
+
+    def requisicao():
+        logs.bind(command="simulado", user="42", guild="7")
+        try:
+            raise ValueError("boom")
+        except ValueError as e:
+            logs.log_error(e, "chat_groq")
+
+    logs.setup_logging()
+    try:
+        contextvars.copy_context().run(requisicao)
+    finally:
+        logs.shutdown_logging()
+
+    linha = json.loads(arquivo.read_text(encoding="utf-8").splitlines()[0])
+    assert linha["level"] == "ERROR"
+    assert linha["msg"] == "chat_groq - ValueError: boom"
+    assert (linha["command"], linha["user"], linha["guild"]) == ("simulado", "42", "7")
+    assert linha["context"] == "chat_groq"
+    assert linha["error_type"] == "ValueError"
+    assert "Traceback" in linha["traceback"]
+
+
+def test_prepare_nao_formata_traceback_no_loop():
+    handler = _NonBlockingQueueHandler(queue.Queue())
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.getLogger("bot").makeRecord(
+            "bot", logging.ERROR, __file__, 0, "falhou", None, sys.exc_info())
+
+    handler.handle(record)
+    enfileirado = handler.queue.get_nowait()
+    assert enfileirado.exc_info is not None
+    assert enfileirado.exc_text is None
+
+
+def test_fila_cheia_descarta_sem_bloquear_e_reporta():
+    handler = _NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(erro("primeiro"))
+    handler.handle(erro("segundo"))
+    assert handler.dropped == 1
+
+    handler.queue.get_nowait()
+    handler.handle(erro("terceiro"))
+    aviso = handler.queue.get_nowait()
+    assert aviso.dropped == 1
+    assert handler.dropped == 1  # "terceiro" não coube depois do aviso